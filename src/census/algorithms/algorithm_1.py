@@ -4,8 +4,11 @@ Gros-desormeaux et al. [1] (see README in the root directory of this repository)
 """
 import networkx as nx
 import datetime as dt
+import numpy as np
 import pandas as pd
 from census.utils.graphs import alter_udg
+from census.utils.triangles import get_smallest_enclosing_circles
+from census.utils.max_clique import get_max_clique
 
 
 def count_birds(
@@ -25,60 +28,93 @@ def count_birds(
         dict: Keys are the name of species in English, and values are the estimated amount of observable birds for this species.
     """
 
-    # make sure that the dataframe is sorted by begin_time
+    # make sure that the time stamps are datetimes, e. g. not objects, and that the dataframe is sorted by begin_time
+    df = df.assign(begin_time=pd.to_datetime(df["begin_time"]), end_time=pd.to_datetime(df["end_time"]))
     df = df.sort_values("begin_time")
 
-    # check if altering is necessary in the current graph
-    altered_graph = alter_udg(graph.copy())
-    altering_necessary = altered_graph.__str__() != graph.__str__()
+    # check if altering is necessary in the current graph, i. e. if any clique of size three has to be altered
+    smallest_enclosing_circles = get_smallest_enclosing_circles(graph=graph)
+    altering_necessary = any(circle[1] > hearing_radius for circle in smallest_enclosing_circles.values())
+    adjacency = {u: set(graph[u]) for u in graph} # neighbours of every node in the given graph
 
     # variables to iterate and count
     wdw_delta = dt.timedelta(seconds=time_delta_detection) # time window as timedelta object
-    wdw_begin = df["begin_time"].min() # begin time of the time window
-    wdw_end = wdw_begin + wdw_delta # end time of the time window
+    wdw_begin = df["begin_time"].min() # begin time of the first time window
     last_stamp = df["end_time"].max() # last time in the dataframe
     species_codes = sorted(df["species_code"].drop_duplicates()) # all species contained in the dataframe
     species_count = {species: 1 for species in species_codes} # initialize dictionary used for the counting
 
-    # iterate over the dataframe with the time window and count birds
-    while wdw_begin < last_stamp:
-
-        # extract all classification results for the current time window
-        mask        = (df["begin_time"] >= wdw_begin) & (df["begin_time"] < wdw_end) \
-                        | (df["end_time"] > wdw_begin) & (df["end_time"] <= wdw_end)
-        df_wdw      = df.loc[mask]
-        wdw_begin   = wdw_end
-        wdw_end     += wdw_delta
-
-        # no classification results => continue to next window
-        if len(df_wdw.index) == 0:
-            continue
-
-        # summarize redundant classification results
-        df_wdw = df_wdw[["node","species_code"]].drop_duplicates()
+    # encode species and nodes as integer codes once, the time windows are processed on these arrays
+    species_idx, species_names = pd.factorize(df["species_code"])
+    node_idx, node_ids = pd.factorize(df["node"])
+    keys = (species_idx.astype(np.int64) << 32) | node_idx # (species, node) pairs packed into one integer
+
+    # assign every classification result to the time windows it belongs to, i. e. the window its begin time
+    # lies in ([wdw_begin, wdw_end)) and the window its end time lies in ((wdw_begin, wdw_end]), missing time stamps
+    # (NaT) belong to no window
+    no_windows = pd.isna(wdw_begin) or pd.isna(last_stamp)
+    n_windows = 0 if no_windows else -((wdw_begin - last_stamp) // wdw_delta) # windows until the last time stamp
+    windows = np.concatenate([
+        ((df["begin_time"] - wdw_begin) // wdw_delta).to_numpy(dtype=np.int64, na_value=-1),
+        (-((wdw_begin - df["end_time"]) // wdw_delta) - 1).to_numpy(dtype=np.int64, na_value=-1),
+    ])
+    events = np.concatenate([keys, keys])
+    rows = np.tile(np.arange(len(df.index)), 2) # position of the classification result in the sorted dataframe
+    valid = (windows >= 0) & (windows < n_windows)
+    windows, events, rows = windows[valid], events[valid], rows[valid]
+
+    # sort the (window, species, node) events and drop repeated ones, keeping the first classification result of each
+    order = np.lexsort((rows, events, windows))
+    windows, events, rows = windows[order], events[order], rows[order]
+    first = np.ones(len(events), dtype=bool)
+    first[1:] = (windows[1:] != windows[:-1]) | (events[1:] != events[:-1])
+    windows, events, rows = windows[first], events[first], rows[first]
+    _, wdw_starts = np.unique(windows, return_index=True)
+
+    # stream through the non-empty time windows and count birds
+    for keys_wdw, rows_wdw in zip(np.split(events, wdw_starts[1:]), np.split(rows, wdw_starts[1:])):
+
+        # the unique (species, node) pairs of the current time window are sorted by species
+        species_wdw = keys_wdw >> 32
+        nodes_wdw = keys_wdw & 0xFFFFFFFF
+        species_wdw, starts = np.unique(species_wdw, return_index=True)
 
         # current time window contains only one bird for the contained species
-        if len(df_wdw.index) == 1 or df_wdw.nunique(axis=0)["species_code"] == len(df_wdw.index):
+        if len(species_wdw) == len(keys_wdw):
             continue
 
         # execute counting algorithm for every species in the current time window
-        for species_code in df_wdw["species_code"].drop_duplicates():
-            df_species = df_wdw.loc[df_wdw["species_code"] == species_code]
-            nodes_species = list(df_species["node"].drop_duplicates())
-
-            # only multiple classification results per species are relevant
-            if len(nodes_species) > 1:
-
-                # construct subgraph containing all nodes that detected the current species
-                graph_species = nx.Graph(graph.subgraph(nodes_species))
-                if altering_necessary: # alter it if necessary
-                    graph_species = alter_udg(graph_species, hearing_radius)
-
-                # count birds for current species
+        for species, nodes, rows_species in zip(species_wdw, np.split(nodes_wdw, starts[1:]), np.split(rows_wdw, starts[1:])):
+            species_code = species_names[species]
+            nodes_species = adjacency.keys() & set(node_ids[nodes])
+
+            # only multiple classification results per species are relevant, and since the count can't exceed
+            # the amount of nodes, only windows with more nodes than the current max (at least 1) can change it
+            if len(nodes_species) > species_count[species_code]:
+
+                # construct subgraph containing all nodes that detected the current species (as neighbour sets)
+                if altering_necessary:
+                    # alter the subgraph of the species on its own, since the removed edges depend on the cliques
+                    # contained in it, the nodes are taken in the order of their first classification result
+                    nodes_ordered = node_ids[nodes[np.argsort(rows_species, kind="stable")]].tolist()
+                    graph_species = alter_udg(nx.Graph(graph.subgraph(nodes_ordered)), hearing_radius, inplace=True)
+                    graph_species = {u: set(graph_species[u]) for u in graph_species}
+                else:
+                    graph_species = {u: adjacency[u] & nodes_species for u in nodes_species}
+
+                # count birds for current species, stop early if the current max can't be exceeded anymore
                 count = 0
-                while len(graph_species.nodes) > 0:
-                    clique = max(nx.find_cliques(G=graph_species), key=len)
-                    graph_species.remove_nodes_from(clique)
+                while len(graph_species) > 0:
+                    if count + len(graph_species) <= species_count[species_code]:
+                        break
+                    if not any(graph_species.values()): # only isolated nodes left, one bird each
+                        count += len(graph_species)
+                        break
+                    clique = get_max_clique(adj=graph_species)
+                    for u in clique:
+                        del graph_species[u]
+                    for neighbours in graph_species.values():
+                        neighbours.difference_update(clique)
                     count += 1
 
                 # overwrite estimation if the current number of birds is bigger than the previous max
@@ -0,0 +1,30 @@
+import datetime as dt
+
+from census.utils.random import generate_graph_diamond_pattern, generate_random_classification_results
+from census.utils.graphs import build_udg
+from census.algorithms.algorithm_1 import count_birds
+
+
+# counts of generated classification results with fixed seeds, pinned to catch changes of the algorithm,
+# including which of several maximum cliques is removed first
+expected_counts = {
+    0: {"blucha1": 3, "comcha": 2},
+    1: {"blucha1": 3, "comcha": 2},
+    2: {"blucha1": 3, "comcha": 2},
+    3: {"blucha1": 2, "comcha": 3},
+}
+
+for seed, expected in expected_counts.items():
+    graph = generate_graph_diamond_pattern(x_rows=4, y_rows=4, seed=seed)
+    build_udg(graph)
+    df = generate_random_classification_results(
+        graph=graph, seed=seed, dt_end=dt.datetime(1970, 1, 1, 0, 30, 0),
+        amount_per_species={"comcha": 3, "blucha1": 5}, songs_per_bird={"comcha": (20, 40), "blucha1": (20, 40)}
+    )
+    species_count = count_birds(df=df, graph=graph)
+    assert species_count == expected, (seed, species_count, expected)
+
+    # the time stamps may also be given as objects
+    df = df.astype({"begin_time": object, "end_time": object})
+    species_count = count_birds(df=df, graph=graph)
+    assert species_count == expected, (seed, species_count, expected)
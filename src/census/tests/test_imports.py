@@ -2,6 +2,7 @@ import census
 import census.algorithms.algorithm_1
 import census.utils.random
 import census.utils.graphs
+import census.utils.max_clique
 import census.utils.triangles
 import census.utils.visualization
 import census.utils.definitions
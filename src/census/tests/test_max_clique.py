@@ -0,0 +1,36 @@
+import itertools
+import networkx as nx
+import numpy as np
+
+from census.utils.max_clique import get_max_clique
+
+
+def is_clique(adj:dict, nodes:list) -> bool:
+    return len(set(nodes)) == len(nodes) and all(v in adj[u] for u, v in itertools.combinations(nodes, 2))
+
+
+# trivial graphs: no node, one node, two nodes with and without an edge
+assert get_max_clique(adj={}) == []
+assert get_max_clique(adj={0: set()}) == [0]
+assert len(get_max_clique(adj={0: set(), 1: set()})) == 1
+assert sorted(get_max_clique(adj={0: {1}, 1: {0}})) == [0, 1]
+
+# isolated nodes next to a triangle and a single edge
+adj = {0: set(), 1: {2, 3}, 2: {1, 3}, 3: {1, 2}, 4: set(), 5: {6}, 6: {5}}
+assert sorted(get_max_clique(adj=adj)) == [1, 2, 3]
+
+# only isolated nodes
+adj = {u: set() for u in range(5)}
+clique = get_max_clique(adj=adj)
+assert len(clique) == 1 and clique[0] in adj
+
+
+# random graphs, compared with the maximal cliques found by networkx
+rng = np.random.RandomState(0)
+for i in range(300):
+    graph = nx.gnp_random_graph(n=rng.randint(0, 16), p=rng.rand(), seed=rng)
+    adj = {u: set(graph[u]) for u in graph}
+    clique = get_max_clique(adj=adj)
+    max_size = max((len(c) for c in nx.find_cliques(G=graph)), default=0)
+    assert len(clique) == max_size, (i, clique, max_size)
+    assert set(clique) <= adj.keys() and is_clique(adj=adj, nodes=clique), (i, clique)
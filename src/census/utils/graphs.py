@@ -2,11 +2,10 @@
 This module contains util/helper functions related to graphs.
 """
 import networkx as nx
-import itertools
-import math
 import utm
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 from census.utils.triangles import get_smallest_enclosing_circles
 
 
@@ -60,42 +59,82 @@ def build_udg(
     Returns:
         nx.Graph: The constructed UDG.
     """
-    for u, v in itertools.combinations(graph.nodes, 2):
-        u_coords, v_coords = graph.nodes[u]["pos"], graph.nodes[v]["pos"]
-        distance = math.sqrt((u_coords[0] - v_coords[0]) ** 2 + (u_coords[1] - v_coords[1]) ** 2)
-        if distance <= hearing_radius * 2:
-            graph.add_edge(u, v, weight=distance)
+    if graph.number_of_nodes() < 2:
+        return graph
+    nodes, pos, _ = get_graph_arrays(graph=graph)
+
+    # find all pairs of nodes within twice the hearing radius with a KD-tree, sorted to add the edges in node order
+    pairs = cKDTree(pos).query_pairs(r=hearing_radius * 2, output_type="ndarray")
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    weights = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1)
+    graph.add_weighted_edges_from(
+        (nodes[u], nodes[v], w) for u, v, w in zip(pairs[:, 0].tolist(), pairs[:, 1].tolist(), weights.tolist())
+    )
 
     return graph
 
 
 def alter_udg(
-    graph:nx.Graph, hearing_radius:float=100.0
+    graph:nx.Graph, hearing_radius:float=100.0, inplace:bool=False
 ) -> nx.Graph:
-    """Alter the given graph by removing the longest edge from all cliques of size three whose
+    """Get the altered graph, i. e. the given graph without the longest edge of all cliques of size three whose
         smallest enclosing circle is larger than the hearing radius (see Gros-desormeaux et al. [1] 
         (see README in the root directory of this repository)).
 
     Args:
         graph (nx.Graph): The graph to alter.
         hearing_radius (float, optional): Radius in meters within which birds can be detected by a node. Defaults to 100.0.
+        inplace (bool, optional): If True, the edges are removed from the given graph and the given graph is returned.
+            Otherwise the given graph stays untouched and a new graph without the removed edges is returned, even if
+            no edge has to be removed. Defaults to False.
 
     Returns:
         nx.Graph: The altered graph.
     """
     smallest_enclosing_circles = get_smallest_enclosing_circles(graph=graph)
+    return alter_udg_from_circles(
+        graph=graph, smallest_enclosing_circles=smallest_enclosing_circles, hearing_radius=hearing_radius, inplace=inplace
+    )
+
+
+def alter_udg_from_circles(
+    graph:nx.Graph, smallest_enclosing_circles:dict, hearing_radius:float=100.0, inplace:bool=False
+) -> nx.Graph:
+    """Same as "alter_udg", but uses the given smallest enclosing circles of the graph's cliques of size three
+        instead of calculating them, e. g. when they are already needed to check if altering is necessary.
+
+    Args:
+        graph (nx.Graph): The graph to alter.
+        smallest_enclosing_circles (dict): The smallest enclosing circles of the graph as returned by 
+            "get_smallest_enclosing_circles" in "census.utils.triangles".
+        hearing_radius (float, optional): Radius in meters within which birds can be detected by a node. Defaults to 100.0.
+        inplace (bool, optional): See "alter_udg". Defaults to False.
+
+    Returns:
+        nx.Graph: The altered graph.
+    """
+    adj = graph.adj
+    removed = set()
 
     for clique, circle in smallest_enclosing_circles.items():
         if circle[1] > hearing_radius: # smallest enclosing circle is bigger than hearing radius
             u, v, w = clique[0], clique[1], clique[2]
-            weights = nx.get_edge_attributes(G=graph, name="weight")
-            if (u, v) not in weights.keys() or (u, w) not in weights.keys() or (v, w) not in weights.keys():
+            edges = (frozenset((u, v)), frozenset((u, w)), frozenset((v, w)))
+            if removed and any(edge in removed for edge in edges):
                 continue # if edge was already removed
-            crt_weights = {(u, v): weights[(u, v)], (u, w): weights[(u, w)], (v, w): weights[(v, w)]} # edge weights of current clique
-            x, y = max(crt_weights, key=lambda k: crt_weights[k]) # find longest edge
-            graph.remove_edge(x, y) # remove it
+            weights = (adj[u][v]["weight"], adj[u][w]["weight"], adj[v][w]["weight"])
+            removed.add(edges[weights.index(max(weights))]) # remove the longest edge
 
-    return graph
+    if inplace:
+        graph.remove_edges_from(tuple(edge) for edge in removed)
+        return graph
+
+    # build the altered graph from the nodes and the remaining edges only
+    altered_graph = nx.Graph()
+    altered_graph.graph.update(graph.graph)
+    altered_graph.add_nodes_from(graph.nodes(data=True))
+    altered_graph.add_edges_from((u, v, data) for u, v, data in graph.edges(data=True) if frozenset((u, v)) not in removed)
+    return altered_graph
 
 
 def get_bb(
@@ -111,12 +150,59 @@ def get_bb(
     Returns:
         tuple: Contains two tuples, each containing the min and max values of the bounding box for the x and y coordinates.
     """
-    pos = nx.get_node_attributes(G=graph, name="pos")
-    pos_x = np.array(list(pos.values()))[:,0]
-    pos_y = np.array(list(pos.values()))[:,1]
+    _, pos, _ = get_graph_arrays(graph=graph)
+    pos_min = pos.min(axis=0)
+    pos_max = pos.max(axis=0)
 
-    xlim = (min(pos_x) - hearing_radius, max(pos_x) + hearing_radius)
-    ylim = (min(pos_y) - hearing_radius, max(pos_y) + hearing_radius)
+    xlim = (pos_min[0] - hearing_radius, pos_max[0] + hearing_radius)
+    ylim = (pos_min[1] - hearing_radius, pos_max[1] + hearing_radius)
 
     return xlim, ylim
 
+
+def get_graph_arrays(
+    graph:nx.Graph
+) -> tuple:
+    """Collects the positions of all nodes into one contiguous array, so that computations on the positions
+        can be done with NumPy on integer indices instead of on the node attributes of the graph.
+
+    Args:
+        graph (nx.Graph): The graph. Every node must have the attribute "pos".
+
+    Returns:
+        tuple: Contains the list of node ids, the positions as np.ndarray of shape (N, 2) with float64 values,
+            where the i-th row belongs to the i-th node id, and a dictionary mapping each node id to its index.
+    """
+    ids = list(graph.nodes)
+    pos_arr = np.array([graph.nodes[n]["pos"] for n in ids], dtype=np.float64).reshape(-1, 2)
+    id_to_idx = {n: i for i, n in enumerate(ids)}
+    return ids, pos_arr, id_to_idx
+
+
+def get_hearing_pairs(
+    pos_xy:np.ndarray, b_pos:np.ndarray, hearing_radius:float=100.0
+) -> tuple:
+    """Finds every pair of bird and node where the bird is within the hearing radius of the node.
+
+    Args:
+        pos_xy (np.ndarray): Positions of the nodes with shape (N, 2), e. g. as returned by "get_graph_arrays".
+        b_pos (np.ndarray): Positions of the birds, e. g. one per song, with shape (K, 2).
+        hearing_radius (float, optional): Radius in meters within which birds can be detected by a node. Defaults to 100.0.
+
+    Returns:
+        tuple: Two arrays containing the bird indices and the node indices of all detections, ordered by bird and node.
+    """
+    r2 = hearing_radius ** 2
+
+    # squared distances of all pairs as |b|^2 + |n|^2 - 2 * b . n, i. e. one matrix product without a (K, N, 2) temporary
+    sq_b = np.einsum("ij,ij->i", b_pos, b_pos)
+    sq_n = np.einsum("ij,ij->i", pos_xy, pos_xy)
+    sq_sum = sq_b[:, None] + sq_n[None, :]
+    d2 = sq_sum - 2 * (b_pos @ pos_xy.T)
+
+    # the identity suffers from cancellation for large coordinates (e. g. UTM), so it only preselects the
+    # candidates with a small relative margin and the exact squared distance decides for these
+    bird_idx, node_idx = np.nonzero(d2 <= r2 + 1e-9 * sq_sum)
+    diff = b_pos[bird_idx] - pos_xy[node_idx]
+    hit = np.einsum("ij,ij->i", diff, diff) <= r2
+    return bird_idx[hit], node_idx[hit]
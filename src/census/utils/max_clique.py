@@ -0,0 +1,77 @@
+"""
+This module contains helper functions to find maximum cliques, used by the counting algorithm.
+"""
+
+
+def get_degeneracy_ordering(
+    adj:dict
+) -> list:
+    """Calculates a degeneracy ordering of the nodes, i. e. the order in which the nodes are removed
+        when successively removing a node with the smallest degree from the graph.
+
+    Args:
+        adj (dict): Keys are the nodes and values are sets containing the neighbours of the node.
+
+    Returns:
+        list: The nodes in degeneracy order.
+    """
+    degrees = {u: len(neighbours) for u, neighbours in adj.items()}
+    ordering = []
+    while degrees:
+        u = min(degrees, key=degrees.get)
+        del degrees[u]
+        for v in adj[u]:
+            if v in degrees:
+                degrees[v] -= 1
+        ordering.append(u)
+    return ordering
+
+
+def get_max_clique(
+    adj:dict
+) -> list:
+    """Finds a maximum clique, i. e. a clique with the largest amount of nodes, in the given graph.
+        Uses the Bron-Kerbosch algorithm with pivoting on a degeneracy ordering of the nodes and
+        prunes all branches which cannot lead to a clique larger than the largest one found so far.
+
+    Args:
+        adj (dict): The graph without self-loops. Keys are the nodes and values are sets containing the
+            neighbours of the node, e. g. {u: set(graph[u]) for u in graph} for a nx.Graph.
+
+    Returns:
+        list: The nodes of a maximum clique. Empty if the graph contains no nodes.
+    """
+
+    # trivial cases: no node, one node, or two nodes with or without an edge
+    if len(adj) <= 2:
+        nodes = list(adj)
+        if len(nodes) == 2 and nodes[1] not in adj[nodes[0]]:
+            return nodes[:1]
+        return nodes
+
+    best = []
+
+    def expand(clique:list, candidates:set) -> None:
+        nonlocal best
+        if not candidates:
+            if len(clique) > len(best):
+                best = clique
+            return
+
+        # pivot on the candidate with the most neighbours among the candidates
+        pivot = max(candidates, key=lambda u: len(adj[u] & candidates))
+        for u in list(candidates - adj[pivot]):
+            if len(clique) + len(candidates) <= len(best):
+                return # the current branch cannot exceed the best clique
+            expand(clique + [u], candidates & adj[u])
+            candidates = candidates - {u}
+
+    # start one search per node, restricted to its neighbours later in the degeneracy ordering
+    ordering = get_degeneracy_ordering(adj)
+    position = {u: i for i, u in enumerate(ordering)}
+    for u in ordering:
+        candidates = {v for v in adj[u] if position[v] > position[u]}
+        if 1 + len(candidates) > len(best):
+            expand([u], candidates)
+
+    return best
@@ -7,7 +7,7 @@ import pandas as pd
 import math
 import datetime as dt
 import networkx as nx
-from census.utils.graphs import get_bb
+from census.utils.graphs import get_bb, get_graph_arrays, get_hearing_pairs
 
 
 def generate_graph_diamond_pattern(
@@ -27,24 +27,29 @@ def generate_graph_diamond_pattern(
     Returns:
         nx.Graph: The generated graph.
     """
-    np.random.seed(seed)
+    rng = np.random.RandomState(seed)
+
+    # row and column of every node, the odd rows are shifted by half the distance and contain one node less
+    rows = np.arange(y_rows * 2 - 1)
+    aux = rows % 2
+    nodes_per_row = x_rows - aux
+    row_starts = np.cumsum(nodes_per_row) - nodes_per_row
+    i = np.repeat(rows, nodes_per_row)
+    j = np.arange(nodes_per_row.sum()) - np.repeat(row_starts, nodes_per_row)
+    aux = np.repeat(aux, nodes_per_row)
+    n_y = i * distance_y / 2
+    n_x = j * distance_x + (aux * distance_x / 2)
+
+    # random circular offset of every node (same random sequence as node by node)
+    rnd = rng.rand(len(i), 3)
+    angle = rnd[:, 0] * 2 * math.pi
+    x_off = rnd[:, 1] * distance_off
+    y_off = rnd[:, 2] * distance_off
+    n_x += np.cos(angle) * x_off
+    n_y += np.sin(angle) * y_off
 
     graph = nx.Graph()
-    n = 0
-    for i in range(y_rows * 2 - 1):
-        aux = i % 2
-        for j in range(x_rows - aux):
-            n_y = i * distance_y / 2
-            n_x = j * distance_x + (aux * distance_x / 2)
-
-            angle = np.random.rand() * 2 * math.pi
-            x_off = np.random.rand() * distance_off
-            y_off = np.random.rand() * distance_off
-            n_x += np.cos(angle) * x_off
-            n_y += np.sin(angle) * y_off
-
-            graph.add_node(n, pos=(n_x, n_y))
-            n += 1
+    graph.add_nodes_from((n, {"pos": pos}) for n, pos in enumerate(zip(n_x.tolist(), n_y.tolist())))
 
     return graph
 
@@ -70,41 +75,43 @@ def generate_graph_random_conditional(
     Returns:
         nx.Graph: The generated graph.
     """
-    np.random.seed(seed)
-
-    def find_intersection_area(c1: tuple, c2: tuple, hearing_radius:float=100.0) -> float:
-        d = math.sqrt((c1[0] - c2[0]) ** 2 + (c1[1] - c2[1]) ** 2)
-        rs = hearing_radius ** 2
-
-        # the circle centers are the same
-        if d == 0:
-            return math.pi * rs
-
-        # check if the circles are overlapping
-        angle = (rs + d ** 2 - rs) / (2 * hearing_radius * d)
-        if (-1 <= angle < 1):
-            theta = math.acos(angle) * 2
-            area = (0.5 * theta * rs) - (0.5 * rs * math.sin(theta))
-            return 2 * area
-
-        return 0
+    rng = np.random.RandomState(seed)
+
+    def find_intersection_areas(centers:np.ndarray, others:np.ndarray, hearing_radius:float=100.0) -> np.ndarray:
+        # areas of the lenses between all pairs of circles of radius r whose centers are d apart, with theta = 2 * acos(d / 2r):
+        # r^2 * (theta - sin(theta)), which is pi * r^2 for d = 0 and 0 for d >= 2r
+        d2 = ((centers[:, None, :] - others[None, :, :]) ** 2).sum(axis=2)
+        near = d2 < (2 * hearing_radius) ** 2 # only these pairs overlap
+        theta = 2 * np.arccos(np.sqrt(d2[near]) / (2 * hearing_radius))
+        areas = np.zeros(d2.shape)
+        areas[near] = hearing_radius ** 2 * (theta - np.sin(theta))
+        return areas
 
     graph = nx.Graph()
     area_ud = math.pi * hearing_radius ** 2
     abs_overlap = pct_overlap * area_ud
     len_bb = math.sqrt(area_ud * n) - bb_limit * 2 * hearing_radius
+    batch_size = 64 # amount of random candidates checked at once
+    accepted = np.empty((n, 2)) # positions of the accepted nodes
     i = 0
     while i < n:
-        pos = nx.get_node_attributes(G=graph, name="pos")
-        new_pos = np.random.rand(2) * len_bb
-        overlap = 0
-        for node, other_pos in pos.items():
-            if math.dist(new_pos, other_pos) > 2 * hearing_radius:
-                continue
-            overlap += find_intersection_area(new_pos, other_pos, hearing_radius=hearing_radius)
-        if overlap < abs_overlap:
+        # draw a batch of candidates (same random sequence as one by one) and check them against the accepted nodes
+        candidates = rng.rand(batch_size, 2) * len_bb
+        overlap = find_intersection_areas(candidates, accepted[:i], hearing_radius=hearing_radius).sum(axis=1)
+
+        # accept the candidates in order, every accepted one adds to the overlap of the following candidates
+        j = 0
+        while i < n:
+            valid = np.flatnonzero(overlap[j:] < abs_overlap)
+            if len(valid) == 0:
+                break
+            j += valid[0]
+            new_pos = candidates[j].copy()
             graph.add_node(i, pos=new_pos)
+            accepted[i] = new_pos
             i += 1
+            j += 1
+            overlap[j:] += find_intersection_areas(candidates[j:], new_pos[None, :], hearing_radius=hearing_radius)[:, 0]
 
     return graph
 
@@ -138,42 +145,52 @@ def generate_random_classification_results(
     timedelta_in_seconds = (dt_end - dt_begin).total_seconds() - 3.0
 
     # length of a classification result
-    timedelta_result = dt.timedelta(seconds=3.0)
+    timedelta_result = pd.Timedelta(seconds=3.0)
 
-    # set seed for the random generator
-    np.random.seed(seed)
+    # random generator for reproducibility, independent of NumPy's global random state
+    rng = np.random.RandomState(seed)
 
-    # initialize dataframe
-    df = pd.DataFrame(columns=["node", "n_x", "n_y", "begin_time", "end_time", "species_code", "b_x", "b_y", "true_count"])
-
-    # generate dataframe
+    # generate the songs of all birds, collected per bird and checked against the nodes once at the end
     xlim, ylim = get_bb(graph=graph, hearing_radius=hearing_radius)
     limit_x = xlim[1] - xlim[0] # width of the bounding box
     limit_y = ylim[1] - ylim[0] # height of the bounding box
-    pos = nx.get_node_attributes(G=graph, name="pos")
-    pos_x = np.array(list(pos.values()))[:,0]
-    pos_y = np.array(list(pos.values()))[:,1]
-    idx = 0
+    nodes, pos_xy, _ = get_graph_arrays(graph=graph)
+    b_pos, offsets, species, counts = [], [], [], [] # one entry per bird, the positions and offsets are per song
     for i, (species_code, true_count) in enumerate(amount_per_species.items()):
 
         for j in range(true_count):
-            songs_this_bird = np.random.randint(low=songs_per_bird[species_code][0], high=songs_per_bird[species_code][1] + 1)
+            songs_this_bird = rng.randint(low=songs_per_bird[species_code][0], high=songs_per_bird[species_code][1] + 1)
             max_delay = timedelta_in_seconds / songs_this_bird
-            for k in range(songs_this_bird):
-
-                # generate variables for current bird
-                b_pos = np.random.rand(2)
-                b_pos[0] = b_pos[0] * limit_x + xlim[0]
-                b_pos[1] = b_pos[1] * limit_y + ylim[0]
-                begin_time = dt_begin + dt.timedelta(seconds=(k + np.random.rand()) * max_delay)
-                end_time = begin_time + timedelta_result
-
-                # check if bird is in hearing radius of the nodes and add classification result for every node this is true
-                for node, n_x, n_y in zip(graph.nodes, pos_x, pos_y):
-                    distance = math.sqrt((n_x - b_pos[0]) ** 2 + (n_y - b_pos[1]) ** 2)
-                    if distance <= hearing_radius:
-                        df.loc[idx] = [node, n_x, n_y, begin_time, end_time, species_code, b_pos[0], b_pos[1], true_count]
-                        idx += 1
-
-    return df.sort_values("begin_time")
 
+            # generate position and delay of all songs of the current bird at once (same random sequence as song by song)
+            rnd = rng.rand(songs_this_bird, 3)
+            b_pos.append(rnd[:, :2] * (limit_x, limit_y) + (xlim[0], ylim[0]))
+            offsets.append((np.arange(songs_this_bird) + rnd[:, 2]) * max_delay)
+            species.append(species_code)
+            counts.append(true_count)
+
+    # add a classification result for every node within the hearing radius of a song
+    songs = [len(offsets_bird) for offsets_bird in offsets] # amount of songs per bird
+    b_pos = np.concatenate(b_pos) if b_pos else np.empty((0, 2))
+    song_idx, node_idx = get_hearing_pairs(pos_xy=pos_xy, b_pos=b_pos, hearing_radius=hearing_radius)
+    offsets = np.concatenate(offsets)[song_idx] if offsets else np.empty(0)
+    species = np.repeat(np.array(species, dtype=object), songs)[song_idx]
+    counts = np.repeat(np.array(counts, dtype=np.int64), songs)[song_idx]
+
+    # convert the song offsets to timestamps with microsecond precision at once, keeping the time zone of dt_begin
+    offsets_us = np.round(offsets * 1e6).astype(np.int64)
+    begin_time = pd.Timestamp(dt_begin) + pd.to_timedelta(offsets_us, unit="us")
+
+    df = pd.DataFrame({
+        "node": [nodes[n] for n in node_idx],
+        "n_x": pos_xy[node_idx, 0],
+        "n_y": pos_xy[node_idx, 1],
+        "begin_time": begin_time,
+        "end_time": begin_time + timedelta_result,
+        "species_code": species,
+        "b_x": b_pos[song_idx, 0],
+        "b_y": b_pos[song_idx, 1],
+        "true_count": counts,
+    })
+
+    return df.sort_values("begin_time", ignore_index=True)
@@ -3,6 +3,7 @@ This module contains helper functions related to 2D triangles, used for the algo
 """
 import math
 import networkx as nx
+import numpy as np
 
 
 def point_in_triangle(
@@ -19,17 +20,7 @@ def point_in_triangle(
     Returns:
         bool: True if point pt is within the triangle, False if not
     """
-    def sign(p1, p2, p3):
-        return (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p2[0] - p3[0]) * (p1[1] - p3[1])
-
-    d1 = sign(pt, p1, p2)
-    d2 = sign(pt, p2, p3)
-    d3 = sign(pt, p3, p1)
-
-    neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
-    pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
-
-    return not (neg and pos)
+    return _point_in_triangle(pt[0], pt[1], p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
 
 
 def get_circumcircle(
@@ -44,14 +35,9 @@ def get_circumcircle(
 
     Returns:
         tuple: Contains a tuple with the x and y coordinates of the center of the circumcircle and its radius.
-            E.g. ((1.2, 0.8), 2.2).
+            E.g. ((1.2, 0.8), 2.2). All values are NaN if the points are collinear.
     """
-    d = 2 * (p1[0] * (p2[1] - p3[1]) + p2[0] * (p3[1] - p1[1]) + p3[0] * (p1[1] - p2[1]))
-    ux = ((p1[0] * p1[0] + p1[1] * p1[1]) * (p2[1] - p3[1]) + (p2[0] * p2[0] + p2[1] * p2[1]) * 
-            (p3[1] - p1[1]) + (p3[0] * p3[0] + p3[1] * p3[1]) * (p1[1] - p2[1])) / d
-    uy = ((p1[0] * p1[0] + p1[1] * p1[1]) * (p3[0] - p2[0]) + (p2[0] * p2[0] + p2[1] * p2[1]) * 
-            (p1[0] - p3[0]) + (p3[0] * p3[0] + p3[1] * p3[1]) * (p2[0] - p1[0])) / d
-    r = math.sqrt((p1[0] - ux) ** 2 + (p1[1] - uy) ** 2)
+    ux, uy, r = _circumcircle(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
     return ((ux, uy), r)
 
 
@@ -69,20 +55,104 @@ def get_smallest_enclosing_circle(
         tuple: Contains a tuple with the x and y coordinates of the center of the smallest enclosing circle and its radius.
             E.g. ((1.2, 0.8), 2.2).
     """
+    x1, y1 = p1[0], p1[1]
+    x2, y2 = p2[0], p2[1]
+    x3, y3 = p3[0], p3[1]
 
-    # return circumcircle if it is already the smallest enclosing circle
-    circumcircle = get_circumcircle(p1, p2, p3)
-    if point_in_triangle(circumcircle[0], p1, p2, p3):
-        return circumcircle
+    # return circumcircle if it is already the smallest enclosing circle (collinear points have no circumcircle)
+    ux, uy, r = _circumcircle(x1, y1, x2, y2, x3, y3)
+    if math.isfinite(r) and _point_in_triangle(ux, uy, x1, y1, x2, y2, x3, y3):
+        return ((ux, uy), r)
 
     # smallest circle is on the longest edge
-    weights = {(p1, p2): math.dist(p1, p2), (p1, p3): math.dist(p1, p3), (p2, p3): math.dist(p2, p3)}
-    pts = max(weights, key=lambda k: weights[k])
-    center = ((pts[0][0] + pts[1][0]) / 2.0, (pts[0][1] + pts[1][1]) / 2.0)
-    radius = weights[pts] / 2.0
+    # squared edge lengths, only the longest edge needs its length
+    w12 = (x1 - x2) ** 2 + (y1 - y2) ** 2
+    w13 = (x1 - x3) ** 2 + (y1 - y3) ** 2
+    w23 = (x2 - x3) ** 2 + (y2 - y3) ** 2
+    if w12 >= w13 and w12 >= w23:
+        ax, ay, bx, by, w = x1, y1, x2, y2, w12
+    elif w13 >= w23:
+        ax, ay, bx, by, w = x1, y1, x3, y3, w13
+    else:
+        ax, ay, bx, by, w = x2, y2, x3, y3, w23
+    center = ((ax + bx) / 2.0, (ay + by) / 2.0)
+    radius = math.sqrt(w) / 2.0
     return (center, radius)
 
 
+def _sign(
+    x1:float, y1:float, x2:float, y2:float, x3:float, y3:float
+) -> float:
+    # orientation of the point (x1, y1) relative to the line through (x2, y2) and (x3, y3)
+    return (x1 - x3) * (y2 - y3) - (x2 - x3) * (y1 - y3)
+
+
+def _point_in_triangle(
+    px:float, py:float, x1:float, y1:float, x2:float, y2:float, x3:float, y3:float
+) -> bool:
+    # same as "point_in_triangle" on plain floats
+    d1 = _sign(px, py, x1, y1, x2, y2)
+    d2 = _sign(px, py, x2, y2, x3, y3)
+    d3 = _sign(px, py, x3, y3, x1, y1)
+
+    neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
+    pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
+
+    return not (neg and pos)
+
+
+def _circumcircle(
+    x1:float, y1:float, x2:float, y2:float, x3:float, y3:float
+) -> tuple:
+    # same as "get_circumcircle" on plain floats, returns (ux, uy, r)
+    sq1 = x1 * x1 + y1 * y1
+    sq2 = x2 * x2 + y2 * y2
+    sq3 = x3 * x3 + y3 * y3
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    if d == 0: # collinear nodes have no circumcircle
+        return math.nan, math.nan, math.nan
+    ux = (sq1 * (y2 - y3) + sq2 * (y3 - y1) + sq3 * (y1 - y2)) / d
+    uy = (sq1 * (x3 - x2) + sq2 * (x1 - x3) + sq3 * (x2 - x1)) / d
+    r = math.sqrt((x1 - ux) ** 2 + (y1 - uy) ** 2)
+    return ux, uy, r
+
+
+def get_triangles(
+    graph:nx.Graph
+) -> list:
+    """Lists all cliques of size three in the given graph by intersecting the neighbourhoods of adjacent nodes,
+        so only actual triangles are visited. The cliques are in the same order as returned by nx.enumerate_all_cliques.
+
+    Args:
+        graph (nx.Graph): The graph.
+
+    Returns:
+        list: The cliques represented as tuples, e.g. [(1, 2, 3), (1, 2, 4)].
+    """
+    nodes = list(graph)
+    index = {u: i for i, u in enumerate(nodes)}
+
+    # neighbourhoods as bitsets, bit j of adj[i] is set if the i-th and j-th node are adjacent
+    adj = [0] * len(nodes)
+    for u, v in graph.edges():
+        i, j = index[u], index[v]
+        adj[i] |= 1 << j
+        adj[j] |= 1 << i
+
+    triangles = []
+    for i, u in enumerate(nodes):
+        later = adj[i] >> (i + 1) << (i + 1) # neighbours coming after u
+        while later:
+            j = (later & -later).bit_length() - 1 # lowest remaining neighbour
+            later &= later - 1
+            common = later & adj[j] # common neighbours coming after both
+            while common:
+                k = (common & -common).bit_length() - 1
+                common &= common - 1
+                triangles.append((u, nodes[j], nodes[k]))
+    return triangles
+
+
 def get_circumcircles(
     graph:nx.Graph
 ) -> dict:
@@ -96,13 +166,10 @@ def get_circumcircles(
             represented as tuples containing the coordinates and the radius.
             E.g. (1, 2, 3): ((1.2, 0.8), 2.2).
     """
-    circumcircles = {}
+    triangles = get_triangles(graph=graph)
     pos = nx.get_node_attributes(G=graph, name="pos")
-    for clique in nx.enumerate_all_cliques(G=graph):
-        if len(clique) == 3:
-            u, v, w = clique[0], clique[1], clique[2]
-            circumcircles[(u, v, w)] = get_circumcircle(pos[u], pos[v], pos[w])
-    return circumcircles
+    ux, uy, r = _circumcircles(_get_triangle_positions(triangles, pos))
+    return {clique: ((x, y), radius) for clique, x, y, radius in zip(triangles, ux.tolist(), uy.tolist(), r.tolist())}
 
 
 def get_smallest_enclosing_circles(
@@ -118,11 +185,62 @@ def get_smallest_enclosing_circles(
             represented as tuples containing the coordinates and the radius.
             E.g. (1, 2, 3): ((1.2, 0.8), 2.2).
     """
-    smallest_enclosing_circles = {}
+    triangles = get_triangles(graph=graph)
     pos = nx.get_node_attributes(G=graph, name="pos")
-    for clique in nx.enumerate_all_cliques(G=graph):
-        if len(clique) == 3:
-            u, v, w = clique[0], clique[1], clique[2]
-            smallest_enclosing_circles[(u, v, w)] = get_smallest_enclosing_circle(pos[u], pos[v], pos[w])
-    return smallest_enclosing_circles
+    cx, cy, r = _smallest_enclosing_circles(_get_triangle_positions(triangles, pos))
+    return {clique: ((x, y), radius) for clique, x, y, radius in zip(triangles, cx.tolist(), cy.tolist(), r.tolist())}
+
 
+def _get_triangle_positions(
+    triangles:list, pos:dict
+) -> np.ndarray:
+    # positions of the nodes of the given cliques with shape (T, 3, 2), gathered from a dense array of all positions
+    if not triangles:
+        return np.empty((0, 3, 2))
+    index = {u: i for i, u in enumerate(pos)}
+    pos_arr = np.array(list(pos.values()), dtype=np.float64)
+    idx = np.fromiter((index[u] for clique in triangles for u in clique), dtype=np.intp, count=3 * len(triangles))
+    return pos_arr[idx.reshape(-1, 3)]
+
+
+def _circumcircles(
+    P:np.ndarray
+) -> tuple:
+    # same as "_circumcircle" for all triangles in P with shape (T, 3, 2) at once, returns the arrays (ux, uy, r)
+    x1, y1, x2, y2, x3, y3 = P[:, 0, 0], P[:, 0, 1], P[:, 1, 0], P[:, 1, 1], P[:, 2, 0], P[:, 2, 1]
+    sq1 = x1 * x1 + y1 * y1
+    sq2 = x2 * x2 + y2 * y2
+    sq3 = x3 * x3 + y3 * y3
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    with np.errstate(divide="ignore", invalid="ignore"): # collinear nodes have no circumcircle
+        ux = (sq1 * (y2 - y3) + sq2 * (y3 - y1) + sq3 * (y1 - y2)) / d
+        uy = (sq1 * (x3 - x2) + sq2 * (x1 - x3) + sq3 * (x2 - x1)) / d
+        r = np.sqrt((x1 - ux) ** 2 + (y1 - uy) ** 2)
+    return ux, uy, r
+
+
+def _smallest_enclosing_circles(
+    P:np.ndarray
+) -> tuple:
+    # same as "get_smallest_enclosing_circle" for all triangles in P with shape (T, 3, 2) at once,
+    # returns the arrays (cx, cy, r)
+    ux, uy, r = _circumcircles(P)
+
+    # the circumcircle is the smallest enclosing circle if its center lies within the triangle
+    signs = np.stack([
+        (ux - P[:, k, 0]) * (P[:, j, 1] - P[:, k, 1]) - (P[:, j, 0] - P[:, k, 0]) * (uy - P[:, k, 1])
+        for j, k in ((0, 1), (1, 2), (2, 0))
+    ])
+    inside = ~((signs < 0).any(axis=0) & (signs > 0).any(axis=0)) & np.isfinite(r)
+
+    # otherwise the smallest circle is on the longest edge
+    pairs = np.array([(0, 1), (0, 2), (1, 2)])
+    lengths_sq = (P[:, pairs[:, 0], 0] - P[:, pairs[:, 1], 0]) ** 2 + (P[:, pairs[:, 0], 1] - P[:, pairs[:, 1], 1]) ** 2
+    longest = pairs[lengths_sq.argmax(axis=1)]
+    rows = np.arange(len(P))
+    a, b = P[rows, longest[:, 0]], P[rows, longest[:, 1]]
+
+    cx = np.where(inside, ux, (a[:, 0] + b[:, 0]) / 2.0)
+    cy = np.where(inside, uy, (a[:, 1] + b[:, 1]) / 2.0)
+    r = np.where(inside, r, np.sqrt(lengths_sq.max(axis=1)) / 2.0)
+    return cx, cy, r
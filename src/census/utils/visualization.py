@@ -2,6 +2,7 @@
 This module contains helper functions related to visualization of the graphs and algorithms.
 """
 import matplotlib as mpl
+import numpy as np
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
@@ -10,6 +11,9 @@ from census.utils.triangles import get_circumcircles
 from census.utils.graphs import get_bb
 from census.utils.definitions import taxonomy
 
+# English names of all species, used as labels in the legend
+_SHORT_NAME = {species_code: name.rsplit("_", 1)[-1] for species_code, name in taxonomy.items()}
+
 
 def plot_birds(
     df:pd.DataFrame, ax:mpl.axes.Axes, species_code_list:list=None, alpha:float=1.0, cmap:mpl.colors.Colormap=None
@@ -25,17 +29,25 @@ def plot_birds(
             If None all species contained in the DataFrame get plotted. Defaults to None.
         alpha (float, optional): Opacity of the plotted markers. Defaults to 1.0.
         cmap (mpl.colors.Colormap, optional): Colormap to be used to distinct between the different species.
-            If None mpl.cm.hsv is used. Defaults to None.
+            If None the "hsv" colormap is used. Defaults to None.
     """
     if cmap == None:
-        cmap = mpl.cm.get_cmap("hsv")
+        cmap = mpl.colormaps["hsv"]
     if species_code_list == None:
         species_code_list = df["species_code"].drop_duplicates()
-    colors = cmap(range(len(species_code_list)))
-    for idx, species_code in enumerate(species_code_list):
-        df_crt = df.loc[df["species_code"] == species_code]
-        color_crt = colors[idx]
-        ax.scatter(list(df_crt["b_x"]), list(df_crt["b_y"]), color=color_crt, alpha=alpha, label=taxonomy[species_code].split("_")[-1], marker="x")
+    species_code_list = list(species_code_list)
+    colors = cmap(np.linspace(0.0, 1.0, len(species_code_list), endpoint=False)) # evenly spread over the colormap
+
+    # plot all birds of the requested species at once, coloured by the index of their species in the list
+    codes = pd.Categorical(df["species_code"], categories=species_code_list).codes
+    plotted = codes >= 0
+    ax.scatter(
+        df["b_x"].to_numpy()[plotted], df["b_y"].to_numpy()[plotted], c=colors[codes[plotted]], alpha=alpha, marker="x"
+    )
+
+    # empty plots per species only for the labels in the legend
+    for species_code, color_crt in zip(species_code_list, colors):
+        ax.scatter([], [], color=color_crt, alpha=alpha, label=_SHORT_NAME[species_code], marker="x")
 
 
 def plot_bb(
@@ -65,11 +77,12 @@ def plot_bb(
         ax.text(x_pos[0], x_pos[1], x_text, horizontalalignment="center", verticalalignment="center")
         ax.text(y_pos[0], y_pos[1], y_text, horizontalalignment="center", verticalalignment="center", rotation=90)
 
-    # plot bounding box
-    ax.plot([xlim[0], xlim[1]], [ylim[0], ylim[0]], c="black", alpha=alpha)
-    ax.plot([xlim[1], xlim[1]], [ylim[1], ylim[0]], c="black", alpha=alpha)
-    ax.plot([xlim[1], xlim[0]], [ylim[1], ylim[1]], c="black", alpha=alpha)
-    ax.plot([xlim[0], xlim[0]], [ylim[0], ylim[1]], c="black", alpha=alpha)
+    # plot bounding box as one rectangle, with the line width of a plotted line
+    bb_patch = mpl.patches.Rectangle(
+        (xlim[0], ylim[0]), xlim[1] - xlim[0], ylim[1] - ylim[0], 
+        fill=False, edgecolor="black", alpha=alpha, linewidth=mpl.rcParams["lines.linewidth"]
+    )
+    ax.add_patch(bb_patch)
 
 
 def draw_circles(
@@ -82,16 +95,23 @@ def draw_circles(
         circles (dict): Circles.
         color (str): Name of the color.
     """
-    for circle in circles:
-        circ_patch = mpl.patches.Circle(circle[0], radius=circle[1], color=color, fill=False, clip_on=False)
-        ax.add_patch(circ_patch)
-        ax.plot(circle[0][0], circle[0][1], marker="o", markersize=3, markeredgecolor=color, markerfacecolor=color)
+    circles = list(circles)
+    if not circles:
+        return
+
+    # add all circles as one collection and all centers as one line without connections
+    circ_patches = [mpl.patches.Circle(center, radius=radius) for center, radius in circles]
+    circ_collection = mpl.collections.PatchCollection(circ_patches, facecolors="none", edgecolors=color, clip_on=False)
+    ax.add_collection(circ_collection)
+    centers_x = [center[0] for center, _ in circles]
+    centers_y = [center[1] for center, _ in circles]
+    ax.plot(centers_x, centers_y, linestyle="none", marker="o", markersize=3, markeredgecolor=color, markerfacecolor=color)
 
 
 def plot_graph(
     graph:nx.Graph, hearing_radius:float=100.0, ax=None, fig:mpl.figure.Figure=None, figsize:tuple=(10.0,10.0),
     with_node_labels:bool=False, with_edges:bool=True, with_edge_labels:bool=False, node_size:int=25, 
-    with_hearing_radii:bool=False, with_circumcircles:bool=False, with_smallest_circles:bool=False
+    with_hearing_radii:bool=False, with_circumcircles:bool=False, with_smallest_circles:bool=False, pos:dict=None
 ) -> tuple:
     """Plot the given graph together with a couple of optional, additional information.
 
@@ -112,6 +132,9 @@ def plot_graph(
         with_hearing_radii (bool, optional): If True, the hearing radii will be drawn. Defaults to False.
         with_circumcircles (bool, optional): If True, the circumcircles will be drawn. Defaults to False.
         with_smallest_circles (bool, optional): If True, the smallest circles will be drawn. Defaults to False.
+        pos (dict, optional): Positions of the nodes, may contain further nodes which are not in the graph. Pass it when plotting 
+            several graphs with the same positions to avoid collecting them from the graph again. If None, the positions 
+            are taken from the node attribute "pos". Defaults to None.
 
     Returns:
         tuple: A tuple containing the Figure and Axes object of the plot.
@@ -125,23 +148,34 @@ def plot_graph(
     ax.set_clip_on(False)
 
     # actual drawing of the graph
-    pos = nx.get_node_attributes(G=graph, name="pos")
+    if pos is None:
+        pos = nx.get_node_attributes(G=graph, name="pos")
     nx.draw_networkx_nodes(G=graph, pos=pos, ax=ax, node_size=node_size, node_color="tab:gray", edgecolors="black")
-    if with_edges:
-        nx.draw_networkx_edges(G=graph, pos=pos, ax=ax)
+    if with_edges and graph.number_of_edges() > 0:
+        # all edges as one line collection behind the nodes, the view is padded like in nx.draw_networkx_edges
+        segments = np.array([(pos[u], pos[v]) for u, v in graph.edges], dtype=np.float64)
+        edge_collection = mpl.collections.LineCollection(segments, colors="k", linewidths=1.0, zorder=1)
+        ax.add_collection(edge_collection, autolim=False)
+        seg_min = segments.min(axis=(0, 1))
+        seg_max = segments.max(axis=(0, 1))
+        pad = 0.05 * (seg_max - seg_min)
+        ax.update_datalim((seg_min - pad, seg_max + pad))
+        ax.autoscale_view()
     if with_node_labels:
         node_labels = {node: int(str(node)[-3:]) for node in graph.nodes}
         nx.draw_networkx_labels(G=graph, pos=pos, ax=ax, labels=node_labels)
     if with_edge_labels:
         weights = nx.get_edge_attributes(G=graph, name="weight")
-        edge_labels = {(u, v): round(graph.edges[u, v]["weight"], 1) for u, v in weights}
+        edge_labels = {edge: round(weight, 1) for edge, weight in weights.items()}
         nx.draw_networkx_edge_labels(G=graph, pos=pos, edge_labels=edge_labels)
 
     # draw hearing radii
     if with_hearing_radii:
-        for crt_pos in pos.values():
-            circ_patch = mpl.patches.Circle(crt_pos, radius=hearing_radius, color="tab:gray", fill=False, clip_on=False, alpha=1.0)
-            ax.add_patch(circ_patch)
+        circ_patches = [mpl.patches.Circle(pos[node], radius=hearing_radius) for node in graph.nodes]
+        circ_collection = mpl.collections.PatchCollection(
+            circ_patches, facecolors="none", edgecolors="tab:gray", clip_on=False, alpha=1.0
+        )
+        ax.add_collection(circ_collection)
 
     # draw smallest circles
     if with_smallest_circles:
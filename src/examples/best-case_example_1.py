@@ -2,14 +2,15 @@
 Showcase of a best case scenario for the algorithm on a predefined graph and predefined classification results.
 The image generated by this script is used in the main README.md.
 """
-import matplotlib.pyplot as plt
 import matplotlib as mpl
+mpl.use("Agg") # the plot is only saved to a file
+import matplotlib.pyplot as plt
 import networkx as nx
 import pandas as pd
+import numpy as np
 import datetime as dt
-import math
 
-from census.utils.graphs import build_udg, alter_udg, get_bb
+from census.utils.graphs import build_udg, alter_udg, get_bb, get_hearing_pairs
 from census.utils.visualization import plot_graph, plot_bb, plot_birds
 
 # generate graph and build udg
@@ -25,86 +26,99 @@ pos = {
     5: (250.0, 185.0),
     6: (300.0, 300.0)
 }
+node_xy = np.array([pos[node] for node in range(len(pos))]) # positions as array, the dict is kept for networkx
 nx.set_node_attributes(G=graph, values=pos, name="pos")
 build_udg(graph=graph)
 
 # generate dataframe with three birds, all singing at the same time for
-df = pd.DataFrame(columns=["node", "n_x", "n_y", "begin_time", "end_time", "species_code", "b_x", "b_y", "true_count"])
-birds = [
+birds = pd.DataFrame([
     (dt.datetime(1970, 1, 1, 0, 0, 0), dt.datetime(1970, 1, 1, 0, 0, 3), "comcha", 90, 40, 3),
     (dt.datetime(1970, 1, 1, 0, 0, 0), dt.datetime(1970, 1, 1, 0, 0, 3), "comcha", 30, 360, 3),
     (dt.datetime(1970, 1, 1, 0, 0, 0), dt.datetime(1970, 1, 1, 0, 0, 3), "comcha", 300, 250, 3)
-]
-idx = 0
-for bird in birds:
-    for node in graph.nodes:
-        n_x, n_y = pos[node][0], pos[node][1]
-        distance = math.sqrt((n_x - bird[3]) ** 2 + (n_y - bird[4]) ** 2)
-        if distance <= 100.0: # add classification result for every node that is hearing the current bird
-            df.loc[idx] = [node, n_x, n_y, bird[0], bird[1], bird[2], bird[3], bird[4], bird[5]]
-            idx += 1
+], columns=["begin_time", "end_time", "species_code", "b_x", "b_y", "true_count"])
+nodes = pd.DataFrame({"node": np.arange(len(node_xy)), "n_x": node_xy[:, 0], "n_y": node_xy[:, 1]})
+
+# add classification result for every node that is hearing a bird, ordered by bird and node
+bird_idx, node_idx = get_hearing_pairs(
+    pos_xy=nodes[["n_x", "n_y"]].to_numpy(dtype=float), b_pos=birds[["b_x", "b_y"]].to_numpy(dtype=float), hearing_radius=100.0
+)
+df = pd.concat([
+    nodes.iloc[node_idx].reset_index(drop=True),
+    birds.iloc[bird_idx].reset_index(drop=True)
+], axis=1)
 
 # plotting
 xlim, ylim = get_bb(graph=graph)
-cmap = mpl.cm.get_cmap("hsv")
-color = cmap(range(1))[0]
 
 fig, ax = plt.subplots(2, 3, figsize=(14, 8))
 
 # 0 initial graph
 ax[0, 0].set(title="Initial UDG with all nodes")
-plot_graph(graph=graph, ax=ax[0, 0], fig=fig, with_edges=True, with_hearing_radii=True)
+plot_graph(graph=graph, ax=ax[0, 0], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
 plot_birds(df=df, ax=ax[0, 0])
 plot_bb(graph=graph, ax=ax[0, 0], xlim=xlim, ylim=ylim)
 
 # 1 subgraph
 ax[0, 1].set(title="Subgraph with all nodes that hear birds")
-subgraph = nx.Graph(graph.subgraph(df["node"].drop_duplicates()))
-plot_graph(graph=subgraph, ax=ax[0, 1], fig=fig, with_edges=True, with_hearing_radii=True)
+subgraph = graph.subgraph(df["node"].unique()) # read-only view, only the altered graph below is modified
+plot_graph(graph=subgraph, ax=ax[0, 1], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
 plot_birds(df=df, ax=ax[0, 1])
 plot_bb(graph=subgraph, ax=ax[0, 1], xlim=xlim, ylim=ylim)
 
 # 2 altered graph
 ax[0, 2].set(title="Alternated UDG")
-altered_graph = alter_udg(subgraph.copy())
-plot_graph(graph=altered_graph, ax=ax[0, 2], fig=fig, with_edges=True, with_hearing_radii=True)
+altered_graph = alter_udg(subgraph)
+plot_graph(graph=altered_graph, ax=ax[0, 2], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
 plot_birds(df=df, ax=ax[0, 2])
 plot_bb(graph=altered_graph, ax=ax[0, 2], xlim=xlim, ylim=ylim)
 
+# maximal cliques of the altered graph, computed once: every clique left after removing nodes is part of one of them
+cliques = list(nx.find_cliques(G=altered_graph))
+removed = set()
+
+# classification results of the nodes which are not removed yet
+alive = np.ones(len(df.index), dtype=bool)
+node_arr = df["node"].to_numpy()
+
 # 3 first clique
 ax[1, 0].set(title="First maximal clique")
-clique = max(nx.find_cliques(G=altered_graph), key=len)
-plot_graph(graph=altered_graph, ax=ax[1, 0], fig=fig, with_edges=True, with_hearing_radii=True)
-plot_birds(df=df, ax=ax[1, 0])
+clique = max(([u for u in c if u not in removed] for c in cliques), key=len)
+plot_graph(graph=altered_graph, ax=ax[1, 0], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
+plot_birds(df=df.loc[alive], ax=ax[1, 0])
 plot_bb(graph=altered_graph, ax=ax[1, 0], xlim=xlim, ylim=ylim)
-for c in clique:
-    circ_patch = mpl.patches.Circle(pos[c], radius=100.0, color="tab:red", fill=True, alpha=0.2, clip_on=False)
-    ax[1, 0].add_patch(circ_patch)
+ax[1, 0].add_collection(mpl.collections.EllipseCollection(
+    widths=200.0, heights=200.0, angles=0.0, units="xy", offsets=node_xy[clique], offset_transform=ax[1, 0].transData,
+    color="tab:red", alpha=0.2, clip_on=False
+))
 altered_graph.remove_nodes_from(clique)
-df = df.loc[(df["node"] != clique[0]) & (df["node"] != clique[1]) & (df["node"] != clique[2])]
+removed.update(clique)
+alive &= ~np.isin(node_arr, clique)
 
 # 4 second clique
 ax[1, 1].set(title="Second maximal clique")
-clique = max(nx.find_cliques(G=altered_graph), key=len)
-plot_graph(graph=altered_graph, ax=ax[1, 1], fig=fig, with_edges=True, with_hearing_radii=True)
-plot_birds(df=df, ax=ax[1, 1])
+clique = max(([u for u in c if u not in removed] for c in cliques), key=len)
+plot_graph(graph=altered_graph, ax=ax[1, 1], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
+plot_birds(df=df.loc[alive], ax=ax[1, 1])
 plot_bb(graph=altered_graph, ax=ax[1, 1], xlim=xlim, ylim=ylim)
-for c in clique:
-    circ_patch = mpl.patches.Circle(pos[c], radius=100.0, color="tab:red", fill=True, alpha=0.2, clip_on=False)
-    ax[1, 1].add_patch(circ_patch)
+ax[1, 1].add_collection(mpl.collections.EllipseCollection(
+    widths=200.0, heights=200.0, angles=0.0, units="xy", offsets=node_xy[clique], offset_transform=ax[1, 1].transData,
+    color="tab:red", alpha=0.2, clip_on=False
+))
 altered_graph.remove_nodes_from(clique)
-df = df.loc[(df["node"] != clique[0]) & (df["node"] != clique[1])]
+removed.update(clique)
+alive &= ~np.isin(node_arr, clique)
 
 # 5 third clique
 ax[1, 2].set(title="Third maximal clique")
-clique = max(nx.find_cliques(G=altered_graph), key=len)
-plot_graph(graph=altered_graph, ax=ax[1, 2], fig=fig, with_edges=True, with_hearing_radii=True)
-plot_birds(df=df, ax=ax[1, 2])
+clique = max(([u for u in c if u not in removed] for c in cliques), key=len)
+plot_graph(graph=altered_graph, ax=ax[1, 2], fig=fig, with_edges=True, with_hearing_radii=True, pos=pos)
+plot_birds(df=df.loc[alive], ax=ax[1, 2])
 plot_bb(graph=altered_graph, ax=ax[1, 2], xlim=xlim, ylim=ylim)
-for c in clique:
-    circ_patch = mpl.patches.Circle(pos[c], radius=100.0, color="tab:red", fill=True, alpha=0.2, clip_on=False)
-    ax[1, 2].add_patch(circ_patch)
-df = df.loc[(df["node"] != clique[0])]
+ax[1, 2].add_collection(mpl.collections.EllipseCollection(
+    widths=200.0, heights=200.0, angles=0.0, units="xy", offsets=node_xy[clique], offset_transform=ax[1, 2].transData,
+    color="tab:red", alpha=0.2, clip_on=False
+))
+alive &= ~np.isin(node_arr, clique)
 
 # plt.tight_layout()
 # plt.show()
@@ -2,6 +2,8 @@
 Plot two graphs generated with the two different random generation methods.
 The image generated by this script is used in the main README.md.
 """
+import matplotlib as mpl
+mpl.use("Agg") # the plot is only saved to a file
 import matplotlib.pyplot as plt
 
 from census.utils.random import generate_graph_diamond_pattern, generate_graph_random_conditional
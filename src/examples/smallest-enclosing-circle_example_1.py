@@ -5,6 +5,8 @@ is on the longest edge of the clique, or the smallest enclosing circle is too bi
 unit disks do not intersect mutually. The resulting plot is used in the main README.md of this repository.
 """
 import networkx as nx
+import matplotlib as mpl
+mpl.use("Agg") # the plot is only saved to a file
 import matplotlib.pyplot as plt
 
 from census.utils.graphs import build_udg
@@ -27,11 +29,11 @@ pos = {0: (0.0, 0.0), 1: (120.0, 30.0), 2: (30.0, 120.0)}
 nx.set_node_attributes(G=graph_1, values=pos, name="pos")
 build_udg(graph=graph_1)
 
-ec, er = get_smallest_enclosing_circle(*nx.get_node_attributes(graph_1, "pos").values())
+ec, er = get_smallest_enclosing_circle(*pos.values())
 xlim_n = (xlim[0] - (xmid - ec[0]), xlim[1] - (xmid - ec[0])) 
 ylim_n = (ylim[0] - (ymid - ec[1]), ylim[1] - (ymid - ec[1]))
 ax[0].set(title="Smallest circle is circumcircle", xlim=xlim_n, ylim=ylim_n)
-plot_graph(graph=graph_1, ax=ax[0], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True)
+plot_graph(graph=graph_1, ax=ax[0], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True, pos=pos)
 plot_bb(graph=graph_1, ax=ax[0], xlim=xlim_n, ylim=ylim_n)
 
 
@@ -42,11 +44,11 @@ pos = {0: (0.0, 0.0), 1: (180.0, 0.0), 2: (90.0, 60.0)}
 nx.set_node_attributes(G=graph_2, values=pos, name="pos")
 build_udg(graph=graph_2)
 
-ec, er = get_smallest_enclosing_circle(*nx.get_node_attributes(graph_2, "pos").values())
+ec, er = get_smallest_enclosing_circle(*pos.values())
 xlim_n = (xlim[0] - (xmid - ec[0]), xlim[1] - (xmid - ec[0])) 
 ylim_n = (ylim[0] - (ymid - ec[1]), ylim[1] - (ymid - ec[1]))
 ax[1].set(title="Smallest circle on longest edge", xlim=xlim_n, ylim=ylim_n)
-plot_graph(graph=graph_2, ax=ax[1], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True)
+plot_graph(graph=graph_2, ax=ax[1], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True, pos=pos)
 plot_bb(graph=graph_2, ax=ax[1], xlim=xlim_n, ylim=ylim_n)
 
 
@@ -57,11 +59,11 @@ pos = {0: (0.0, 0.0), 1: (190.0, 0.0), 2: (95.0, 165.0)}
 nx.set_node_attributes(G=graph_3, values=pos, name="pos")
 build_udg(graph=graph_3)
 
-ec, er = get_smallest_enclosing_circle(*nx.get_node_attributes(graph_3, "pos").values())
+ec, er = get_smallest_enclosing_circle(*pos.values())
 xlim_n = (xlim[0] - (xmid - ec[0]), xlim[1] - (xmid - ec[0])) 
 ylim_n = (ylim[0] - (ymid - ec[1]), ylim[1] - (ymid - ec[1]))
 ax[2].set(title="Smallest circle is too big", xlim=xlim_n, ylim=ylim_n)
-plot_graph(graph=graph_3, ax=ax[2], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True)
+plot_graph(graph=graph_3, ax=ax[2], fig=fig, with_edges=True, with_hearing_radii=True, with_smallest_circles=True, pos=pos)
 plot_bb(graph=graph_3, ax=ax[2], xlim=xlim_n, ylim=ylim_n)
 
 